@@ -5,29 +5,78 @@ A secure WebSocket client for connecting to the fishing game server.
 """
 
 import asyncio
+import codecs
+import copy
+import os
+import socket
 import websockets
 import json
 import threading
 import time
 import logging
+import sys
 from typing import Optional, Callable, Any
 
+from protocol import dumps as _dumps, loads as _loads, encode_batch, run_event_loop, setup_logging
+
 # Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+setup_logging()
 logger = logging.getLogger(__name__)
 
 class GameClient:
     """Main game client for connecting to the fishing game server"""
     
+    # Constant messages are encoded once instead of on every send
+    _STATE_FRAME = _dumps({"type": "get_game_state"})
+    _START_FISHING_FRAME = _dumps({"type": "player_action", "data": {"action": "start_fishing"}})
+    _STOP_FISHING_FRAME = _dumps({"type": "player_action", "data": {"action": "stop_fishing"}})
+    # Chat frames only differ in the text, which is encoded into this template
+    _CHAT_FRAME_PREFIX = b'{"type":"chat_message","text":'
+    
+    # Outbox key for actions that only set the player's fishing state; when
+    # several are queued at once, only the last one needs to be sent
+    _FISHING_STATE = "fishing_state"
+    
+    # Fixed attribute layout: smaller instances and faster attribute access
+    __slots__ = (
+        "websocket", "connected", "client_id", "player_name", "lobby_code",
+        "_state_ref", "message_handlers", "running", "_stop", "_outbox",
+        "_writer_task", "_builtin_handlers", "__weakref__",
+    )
+    
     def __init__(self):
         self.websocket: Optional[Any] = None
         self.connected = False
         self.client_id: Optional[str] = None
         self.player_name: Optional[str] = None
         self.lobby_code: Optional[str] = None
-        self.game_state = {}
+        self._state_ref: Optional[dict] = None
         self.message_handlers = {}
         self.running = False
+        self._stop: Optional[asyncio.Event] = None
+        self._outbox: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        
+        # Message type -> built-in handler, looked up once per message
+        self._builtin_handlers = {
+            "error": self._on_error,
+            "player_joined": self._on_player_joined,
+            "player_left": self._on_player_left,
+            "game_state": self._on_game_state,
+            "player_started_fishing": self._on_player_started_fishing,
+            "player_stopped_fishing": self._on_player_stopped_fishing,
+            "fish_caught": self._on_fish_caught,
+            "chat_message": self._on_chat_message,
+        }
+    
+    @property
+    def game_state(self) -> dict:
+        """Latest game state received from the server (shared, do not mutate)"""
+        return self._state_ref if self._state_ref is not None else {}
+    
+    def snapshot_state(self) -> dict:
+        """Return a private deep copy of the latest game state"""
+        return copy.deepcopy(self.game_state)
     
     def add_message_handler(self, message_type: str, handler: Callable):
         """Add a handler for specific message types"""
@@ -39,7 +88,20 @@ class GameClient:
             uri = f"ws://{server_host}:{server_port}"
             logger.info(f"Connecting to {uri}...")
             
-            self.websocket = await websockets.connect(uri)
+            # Game frames are small JSON objects, so permessage-deflate would
+            # only burn CPU on both ends; the server should disable it too
+            self.websocket = await websockets.connect(
+                uri,
+                compression=None,
+                max_size=2**20,
+                max_queue=64,
+                # Keep-alive is handled by websockets with protocol-level pings
+                ping_interval=30,
+                ping_timeout=10,
+            )
+            self._set_nodelay()
+            # Created here rather than in __init__ so it binds to the running loop
+            self._stop = asyncio.Event()
             
             # Send join lobby request directly (before setting connected=True)
             join_message = {
@@ -49,11 +111,11 @@ class GameClient:
             }
             
             logger.info("Sending join lobby request...")
-            await self.websocket.send(json.dumps(join_message))
+            await self.websocket.send(_dumps(join_message))
             
             # Wait for response
-            response_msg = await self.websocket.recv()
-            response = json.loads(response_msg)
+            response_msg = await self.websocket.recv(decode=False)
+            response = _loads(response_msg)
             
             if response.get("type") == "welcome":
                 self.connected = True
@@ -65,6 +127,10 @@ class GameClient:
                 logger.info(f"Player Name: {self.player_name}")
                 logger.info(f"Lobby Code: {self.lobby_code}")
                 
+                # All outgoing messages go through one writer task from now on
+                self._outbox = asyncio.Queue()
+                self._writer_task = asyncio.create_task(self._write_outbox())
+                
                 return True
             
             elif response.get("type") == "error":
@@ -91,16 +157,89 @@ class GameClient:
             logger.error(f"Connection error: {e}")
             return False
     
+    def _set_nodelay(self):
+        """Disable Nagle's algorithm so small frames are sent immediately"""
+        # asyncio's own transports already do this; set it explicitly so it
+        # holds for whichever loop/transport the connection ended up on
+        transport = getattr(self.websocket, "transport", None)
+        sock = transport.get_extra_info("socket") if transport is not None else None
+        if sock is None:
+            return
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError as e:
+            logger.debug(f"Could not set TCP_NODELAY: {e}")
+    
     async def disconnect(self):
         """Disconnect from the server"""
         if self.websocket and self.connected:
+            # Let the writer send whatever is still queued
+            try:
+                await asyncio.wait_for(self._outbox.join(), timeout=2.0)
+            except asyncio.TimeoutError:
+                logger.warning("Dropping unsent messages on disconnect")
+            self._stop_writer()
             self.running = False
             self.connected = False
+            # Wake the listener: its pending recv() raises ConnectionClosed
+            self._stop.set()
             await self.websocket.close()
             logger.info("Disconnected from server")
     
     async def send_message(self, message: dict):
-        """Send a JSON message to the server"""
+        """Queue a JSON message to be sent to the server"""
+        queued = self._enqueue(_dumps(message))
+        # Guarded and %-formatted so nothing is built when debug logging is off
+        if queued and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Queued message: %s", message.get("type", "unknown"))
+        return queued
+    
+    def _enqueue(self, frame: bytes, key: Optional[str] = None) -> bool:
+        """Hand an encoded frame to the writer task"""
+        if not self.websocket:
+            logger.warning("Cannot send message: no websocket connection")
+            return False
+        
+        if not self.connected:
+            logger.warning("Cannot send message: not connected to server")
+            return False
+        
+        self._outbox.put_nowait((key, frame))
+        return True
+    
+    async def _write_outbox(self):
+        """Send queued frames, merging everything that is ready into one frame"""
+        while True:
+            pending = [await self._outbox.get()]
+            while not self._outbox.empty():
+                pending.append(self._outbox.get_nowait())
+            
+            try:
+                frames = self._coalesce(pending)
+                if len(frames) == 1:
+                    await self._send_raw(frames[0])
+                else:
+                    await self._send_raw(encode_batch(frames))
+            finally:
+                for _ in pending:
+                    self._outbox.task_done()
+    
+    def _coalesce(self, pending: list) -> list:
+        """Drop keyed frames that are superseded by a later frame with the same key"""
+        last_index = {key: i for i, (key, _) in enumerate(pending) if key is not None}
+        return [
+            frame for i, (key, frame) in enumerate(pending)
+            if key is None or last_index[key] == i
+        ]
+    
+    def _stop_writer(self):
+        """Cancel the writer task if it is running"""
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            self._writer_task = None
+    
+    async def _send_raw(self, payload: bytes) -> bool:
+        """Send an already-encoded frame to the server"""
         if not self.websocket:
             logger.warning("Cannot send message: no websocket connection")
             return False
@@ -110,8 +249,7 @@ class GameClient:
             return False
         
         try:
-            await self.websocket.send(json.dumps(message))
-            logger.debug(f"Sent message: {message.get('type', 'unknown')}")
+            await self.websocket.send(payload)
             return True
         except websockets.exceptions.ConnectionClosed:
             logger.warning("Connection closed while sending message")
@@ -126,57 +264,73 @@ class GameClient:
         """Handle incoming messages from the server"""
         message_type = message.get("type", "unknown")
         
+        if message_type == "batch":
+            # Several server messages coalesced into one frame
+            for item in message.get("messages", []):
+                if isinstance(item, dict):
+                    await self.handle_message(item)
+            return
+        
         # Call custom handler if available
-        if message_type in self.message_handlers:
+        custom_handler = self.message_handlers.get(message_type)
+        if custom_handler is not None:
             try:
-                self.message_handlers[message_type](message)
+                custom_handler(message)
             except Exception as e:
                 logger.error(f"Error in custom handler for {message_type}: {e}")
         
         # Built-in message handling
-        if message_type == "error":
-            error_msg = message.get("message", "Unknown error")
-            logger.error(f"Server error: {error_msg}")
-        
-        elif message_type == "player_joined":
-            player_name = message.get("player_name", "Unknown")
-            total_players = message.get("total_players", 0)
-            logger.info(f"Player '{player_name}' joined the game (Total: {total_players})")
-        
-        elif message_type == "player_left":
-            player_name = message.get("player_name", "Unknown")
-            total_players = message.get("total_players", 0)
-            logger.info(f"Player '{player_name}' left the game (Total: {total_players})")
-        
-        elif message_type == "game_state":
-            self.game_state = message.get("state", {})
-            logger.debug("Received game state update")
-        
-        elif message_type == "player_started_fishing":
-            player_name = message.get("player_name", "Unknown")
-            logger.info(f"🎣 {player_name} started fishing!")
-        
-        elif message_type == "player_stopped_fishing":
-            player_name = message.get("player_name", "Unknown")
-            logger.info(f"🛑 {player_name} stopped fishing")
-        
-        elif message_type == "fish_caught":
-            player_name = message.get("player_name", "Unknown")
-            fish_type = message.get("fish_type", "unknown")
-            new_score = message.get("new_score", 0)
-            logger.info(f"🐟 {player_name} caught a fish '{fish_type}'! Score: {new_score}")
-        
-        elif message_type == "chat_message":
-            player_name = message.get("player_name", "Unknown")
-            text = message.get("text", "")
-            timestamp = message.get("timestamp", time.time())
-            logger.info(f"[CHAT] {player_name}: {text}")
-        
-        elif message_type == "pong":
-            logger.debug("Received pong from server")
-        
+        handler = self._builtin_handlers.get(message_type)
+        if handler is not None:
+            handler(message)
         else:
-            logger.debug(f"Unhandled message type: {message_type}")
+            logger.debug("Unhandled message type: %s", message_type)
+    
+    def _on_error(self, message: dict):
+        """Log an error reported by the server"""
+        error_msg = message.get("message", "Unknown error")
+        logger.error(f"Server error: {error_msg}")
+    
+    def _on_player_joined(self, message: dict):
+        """Log a player joining"""
+        player_name = message.get("player_name", "Unknown")
+        total_players = message.get("total_players", 0)
+        logger.info(f"Player '{player_name}' joined the game (Total: {total_players})")
+    
+    def _on_player_left(self, message: dict):
+        """Log a player leaving"""
+        player_name = message.get("player_name", "Unknown")
+        total_players = message.get("total_players", 0)
+        logger.info(f"Player '{player_name}' left the game (Total: {total_players})")
+    
+    def _on_game_state(self, message: dict):
+        """Store the latest game state"""
+        # Just keep a reference; copying is left to snapshot_state()
+        self._state_ref = message.get("state")
+        logger.debug("Received game state update")
+    
+    def _on_player_started_fishing(self, message: dict):
+        """Log a player starting to fish"""
+        player_name = message.get("player_name", "Unknown")
+        logger.info(f"🎣 {player_name} started fishing!")
+    
+    def _on_player_stopped_fishing(self, message: dict):
+        """Log a player stopping fishing"""
+        player_name = message.get("player_name", "Unknown")
+        logger.info(f"🛑 {player_name} stopped fishing")
+    
+    def _on_fish_caught(self, message: dict):
+        """Log a caught fish"""
+        player_name = message.get("player_name", "Unknown")
+        fish_type = message.get("fish_type", "unknown")
+        new_score = message.get("new_score", 0)
+        logger.info(f"🐟 {player_name} caught a fish '{fish_type}'! Score: {new_score}")
+    
+    def _on_chat_message(self, message: dict):
+        """Log a chat message"""
+        player_name = message.get("player_name", "Unknown")
+        text = message.get("text", "")
+        logger.info(f"[CHAT] {player_name}: {text}")
     
     async def listen_for_messages(self):
         """Listen for incoming messages from the server"""
@@ -185,42 +339,30 @@ class GameClient:
             return
             
         try:
-            while self.connected and self.websocket:
+            while not self._stop.is_set():
                 try:
-                    # Wait for message with timeout
-                    message = await asyncio.wait_for(self.websocket.recv(), timeout=1.0)
-                    try:
-                        data = json.loads(message)
-                        await self.handle_message(data)
-                    except json.JSONDecodeError:
-                        logger.warning("Received invalid JSON from server")
-                    except Exception as e:
-                        logger.error(f"Error handling message: {e}")
-                except asyncio.TimeoutError:
-                    # Timeout is normal, just continue listening
-                    continue
+                    # Raw bytes: skips UTF-8 decoding (and validation) of text
+                    # frames; the JSON decoder accepts bytes directly
+                    message = await self.websocket.recv(decode=False)
                 except websockets.exceptions.ConnectionClosed:
-                    logger.info("Server connection closed")
-                    self.connected = False
+                    if not self._stop.is_set():
+                        logger.info("Server connection closed")
                     break
+                try:
+                    data = _loads(message)
+                except ValueError:
+                    # json/orjson decode errors (and invalid UTF-8) are ValueErrors
+                    logger.warning("Received invalid JSON from server")
+                    continue
+                try:
+                    await self.handle_message(data)
                 except Exception as e:
-                    logger.error(f"Error receiving message: {e}")
-                    break
+                    logger.error(f"Error handling message: {e}")
         except Exception as e:
             logger.error(f"Error in message listener: {e}")
         finally:
             self.connected = False
-    
-    async def ping_server(self):
-        """Send periodic ping to keep connection alive"""
-        while self.connected and self.running:
-            await asyncio.sleep(30)  # Ping every 30 seconds
-            if self.connected and self.websocket:
-                success = await self.send_message({"type": "ping"})
-                if not success:
-                    logger.warning("Failed to send ping, connection may be lost")
-                    self.connected = False
-                    break
+            self._stop_writer()
     
     async def run(self):
         """Main client loop"""
@@ -231,27 +373,8 @@ class GameClient:
         self.running = True
         logger.info("Client is running. Type commands to interact...")
         
-        # Start background tasks
-        listen_task = asyncio.create_task(self.listen_for_messages())
-        ping_task = asyncio.create_task(self.ping_server())
-        
         try:
-            # Wait for either task to complete (usually means disconnection)
-            done, pending = await asyncio.wait(
-                [listen_task, ping_task],
-                return_when=asyncio.FIRST_COMPLETED
-            )
-            
-            # Cancel remaining tasks
-            for task in pending:
-                task.cancel()
-                try:
-                    await task
-                except asyncio.CancelledError:
-                    pass
-                except Exception as e:
-                    logger.error(f"Error canceling task: {e}")
-                
+            await self.listen_for_messages()
         except Exception as e:
             logger.error(f"Error in client main loop: {e}")
         finally:
@@ -262,42 +385,48 @@ class GameClient:
     # Game-specific methods
     async def send_chat_message(self, text: str) -> bool:
         """Send a chat message"""
-        return await self.send_message({
-            "type": "chat_message",
-            "text": text
-        })
+        return self._enqueue(self._CHAT_FRAME_PREFIX + _dumps(text) + b"}")
     
     async def start_fishing(self) -> bool:
         """Start fishing"""
-        return await self.send_message({
-            "type": "player_action",
-            "data": {
-                "action": "start_fishing"
-            }
-        })
+        return self._enqueue(self._START_FISHING_FRAME, key=self._FISHING_STATE)
     
     async def stop_fishing(self) -> bool:
         """Stop fishing"""
-        return await self.send_message({
-            "type": "player_action",
-            "data": {
-                "action": "stop_fishing"
-            }
-        })
+        return self._enqueue(self._STOP_FISHING_FRAME, key=self._FISHING_STATE)
     
     async def request_game_state(self) -> bool:
         """Request current game state from server"""
-        return await self.send_message({"type": "get_game_state"})
+        return self._enqueue(self._STATE_FRAME)
 
 # Interactive client for testing
 class InteractiveClient:
     """Interactive command-line client for testing"""
     
+    __slots__ = (
+        "client", "input_thread", "input_task", "reading_stdin", "stdin_decoder",
+        "partial_line", "running", "loop", "commands", "pending_commands", "__weakref__",
+    )
+    
     def __init__(self):
         self.client = GameClient()
         self.input_thread = None
+        self.input_task = None
+        self.reading_stdin = False
+        self.stdin_decoder = codecs.getincrementaldecoder(sys.stdin.encoding or "utf-8")(errors="replace")
+        self.partial_line = ""
         self.running = False
         self.loop = None
+        self.pending_commands = set()  # Strong references to running command tasks
+        
+        # Command name -> handler taking the rest of the line
+        self.commands = {
+            "/chat": self._cmd_chat,
+            "/fish": self._cmd_fish,
+            "/stop": self._cmd_stop,
+            "/state": self._cmd_state,
+            "/quit": self._cmd_quit,
+        }
     
     def setup_handlers(self):
         """Setup custom message handlers"""
@@ -317,8 +446,8 @@ class InteractiveClient:
         
         self.client.add_message_handler("game_state", on_game_state)
     
-    def input_handler(self):
-        """Handle user input in a separate thread"""
+    def print_commands(self):
+        """Print the list of available commands"""
         print("\n=== Fishing Game Client ===")
         print("Commands:")
         print("  /chat <message>  - Send chat message")
@@ -327,80 +456,160 @@ class InteractiveClient:
         print("  /state           - Request game state")
         print("  /quit            - Disconnect and quit")
         print("============================\n")
-        
+    
+    async def handle_command(self, command: str):
+        """Run a command typed by the user"""
+        try:
+            # One pass splits off the command name and skips surrounding whitespace
+            parts = command.split(maxsplit=1)
+            if not parts:
+                return
+            
+            handler = self.commands.get(parts[0])
+            if handler is None:
+                print("Unknown command. Type /quit to exit.")
+                return
+            await handler(parts[1].rstrip() if len(parts) > 1 else "")
+                
+        except Exception as e:
+            logger.error(f"Error in input handler: {e}")
+    
+    async def _run_commands(self, lines: list):
+        """Run several input lines in order"""
+        for line in lines:
+            await self.handle_command(line)
+    
+    async def _send(self, action: Callable, *args):
+        """Run a client action if we are connected"""
+        if self.client.connected:
+            await action(*args)
+        else:
+            print("Not connected to server!")
+    
+    async def _cmd_chat(self, rest: str):
+        """/chat - Send a chat message"""
+        if not rest:
+            print("Usage: /chat <message>")
+            return
+        await self._send(self.client.send_chat_message, rest)
+    
+    async def _cmd_fish(self, rest: str):
+        """/fish - Start fishing"""
+        await self._send(self.client.start_fishing)
+    
+    async def _cmd_stop(self, rest: str):
+        """/stop - Stop fishing"""
+        await self._send(self.client.stop_fishing)
+    
+    async def _cmd_state(self, rest: str):
+        """/state - Request game state"""
+        await self._send(self.client.request_game_state)
+    
+    async def _cmd_quit(self, rest: str):
+        """/quit - Disconnect and quit"""
+        self.running = False
+        self.stop_input()
+        await self.client.disconnect()
+    
+    def start_input(self):
+        """Start reading commands from stdin"""
+        self.print_commands()
+        if sys.platform == "win32":
+            # Console input can't be watched by the Windows event loops and a
+            # blocking read can't be cancelled, so use a daemon reader thread
+            self.input_thread = threading.Thread(target=self.input_handler, daemon=True)
+            self.input_thread.start()
+            return
+        try:
+            # Let the event loop wake us when a line is ready, no thread needed
+            self.loop.add_reader(sys.stdin.fileno(), self._on_stdin_ready)
+            self.reading_stdin = True
+        except (NotImplementedError, OSError, ValueError):
+            # stdin is a regular file (e.g. `client.py < commands.txt`), which
+            # can't be polled, so read it a line at a time in a worker thread
+            self.input_task = asyncio.create_task(self._read_file_input())
+    
+    def stop_input(self):
+        """Stop reading commands from stdin"""
+        if self.reading_stdin:
+            self.loop.remove_reader(sys.stdin.fileno())
+            self.reading_stdin = False
+    
+    def _on_stdin_ready(self):
+        """Read whatever is ready on stdin and run each complete line"""
+        # os.read instead of sys.stdin.readline(): a buffered readline can pull
+        # several lines into Python's buffer and the loop would never wake for them
+        data = os.read(sys.stdin.fileno(), 4096)
+        if not data:
+            # EOF
+            self.stop_input()
+            return
+        *lines, self.partial_line = (self.partial_line + self.stdin_decoder.decode(data)).split("\n")
+        if lines:
+            self._fire_and_forget(self._run_commands(lines))
+    
+    async def _read_file_input(self):
+        """Run the commands in a non-pollable stdin until EOF or /quit"""
+        while self.running:
+            # Off the loop, so file reads never stall it; awaiting every line
+            # also lets listen_for_messages run between commands
+            line = await asyncio.to_thread(sys.stdin.readline)
+            if not line:
+                break  # EOF
+            await self.handle_command(line)
+    
+    def _fire_and_forget(self, coro):
+        """Run a command coroutine in the background without waiting for its result"""
+        # The loop only holds weak references to tasks, so keep one until it finishes
+        task = asyncio.ensure_future(coro)
+        self.pending_commands.add(task)
+        task.add_done_callback(self.pending_commands.discard)
+    
+    def input_handler(self):
+        """Read user input in a separate thread (Windows only)"""
         while self.running:
             try:
-                command = input().strip()
-                if not command:
-                    continue
-                
-                if command.startswith("/chat "):
-                    message = command[6:]
-                    if self.client.connected and self.loop:
-                        asyncio.run_coroutine_threadsafe(
-                            self.client.send_chat_message(message),
-                            self.loop
-                        )
-                    else:
-                        print("Not connected to server!")
-                
-                elif command == "/fish":
-                    if self.client.connected and self.loop:
-                        asyncio.run_coroutine_threadsafe(
-                            self.client.start_fishing(),
-                            self.loop
-                        )
-                    else:
-                        print("Not connected to server!")
-                
-                elif command == "/stop":
-                    if self.client.connected and self.loop:
-                        asyncio.run_coroutine_threadsafe(
-                            self.client.stop_fishing(),
-                            self.loop
-                        )
-                    else:
-                        print("Not connected to server!")
-                
-                elif command == "/state":
-                    if self.client.connected and self.loop:
-                        asyncio.run_coroutine_threadsafe(
-                            self.client.request_game_state(),
-                            self.loop
-                        )
-                    else:
-                        print("Not connected to server!")
-                
-                elif command == "/quit":
-                    self.running = False
-                    if self.loop:
-                        asyncio.run_coroutine_threadsafe(
-                            self.client.disconnect(),
-                            self.loop
-                        )
-                    break
-                
-                else:
-                    print("Unknown command. Type /quit to exit.")
-                    
+                command = input()
             except EOFError:
                 break
-            except Exception as e:
-                logger.error(f"Error in input handler: {e}")
+            self.loop.call_soon_threadsafe(self._fire_and_forget, self.handle_command(command))
+    
+    def prompt(self, text: str) -> str:
+        """input() that never reads stdin past the end of the answer"""
+        if sys.platform == "win32" or sys.stdin.isatty():
+            # Terminals hand input() one line at a time; Windows keeps using
+            # sys.stdin afterwards, so its buffer is never skipped
+            return input(text)
+        # Piped or redirected stdin: input() would fill sys.stdin's buffer with
+        # the commands that follow, where the fd-level reader in start_input()
+        # can't see them. Read the answer a byte at a time instead.
+        print(text, end="", flush=True)
+        fd = sys.stdin.fileno()
+        line = bytearray()
+        while True:
+            char = os.read(fd, 1)
+            if not char:
+                if not line:
+                    raise EOFError
+                break
+            if char == b"\n":
+                break
+            line += char
+        return line.decode(sys.stdin.encoding or "utf-8", errors="replace").rstrip("\r")
     
     async def start_interactive(self):
         """Start interactive client session"""
         # Get connection details
         print("=== Fishing Game Client ===")
-        server_host = input("Server host (default: localhost): ").strip() or "localhost"
+        server_host = self.prompt("Server host (default: localhost): ").strip() or "localhost"
         
         try:
-            server_port = int(input("Server port (default: 8765): ").strip() or "8765")
+            server_port = int(self.prompt("Server port (default: 8765): ").strip() or "8765")
         except ValueError:
             server_port = 8765
         
-        lobby_code = input("Lobby code: ").strip()
-        player_name = input("Your player name: ").strip() or f"Player_{int(time.time())}"
+        lobby_code = self.prompt("Lobby code: ").strip()
+        player_name = self.prompt("Your player name: ").strip() or f"Player_{int(time.time())}"
         
         # Setup handlers
         self.setup_handlers()
@@ -410,12 +619,13 @@ class InteractiveClient:
             self.running = True
             self.loop = asyncio.get_running_loop()  # Store the current event loop
             
-            # Start input handler thread
-            self.input_thread = threading.Thread(target=self.input_handler, daemon=True)
-            self.input_thread.start()
+            self.start_input()
             
             # Run client
-            await self.client.run()
+            try:
+                await self.client.run()
+            finally:
+                self.stop_input()
         else:
             print("Failed to connect to server.")
 
@@ -424,7 +634,7 @@ if __name__ == "__main__":
     interactive_client = InteractiveClient()
     
     try:
-        asyncio.run(interactive_client.start_interactive())
+        run_event_loop(interactive_client.start_interactive())
     except KeyboardInterrupt:
         logger.info("Client shutting down...")
     except Exception as e:
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Fishing Game - Shared Protocol Helpers
+JSON codec, logging setup, batch envelope and event-loop runner used by the client, server and test scripts.
+"""
+
+import asyncio
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+
+# Prefer orjson for the per-frame JSON codec; it returns bytes, which
+# websocket.send() accepts directly. Fall back to the standard library.
+try:
+    import orjson
+    dumps = orjson.dumps
+    loads = orjson.loads
+except ImportError:
+    # Compact separators and raw UTF-8, matching orjson's output
+    _json_encode = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+    def dumps(obj) -> bytes:
+        return _json_encode(obj).encode("utf-8")
+    loads = json.loads
+
+# uvloop is an optional drop-in replacement for the default event loop
+# (not available on Windows)
+uvloop = None
+if sys.platform != "win32":
+    try:
+        import uvloop
+    except ImportError:
+        pass
+
+_log_listener = None
+
+def setup_logging():
+    """Route logging through a queue so stderr writes happen off the calling thread"""
+    # Records are only queued on the calling thread; a listener thread does the
+    # timestamp formatting and stderr writes so they never block the loop.
+    # Safe to call from every entry point: only the first call installs it.
+    global _log_listener
+    if _log_listener is not None:
+        return
+    log_handler = logging.StreamHandler()
+    log_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    _log_listener = logging.handlers.QueueListener(queue.SimpleQueue(), log_handler)
+    queue_handler = logging.handlers.QueueHandler(_log_listener.queue)
+    queue_handler.setFormatter(logging.Formatter())  # Leave the layout to log_handler
+    logging.basicConfig(level=logging.INFO, handlers=[queue_handler])
+    _log_listener.start()
+    atexit.register(_log_listener.stop)  # Flush anything still queued on exit
+
+def encode_batch(frames) -> bytes:
+    """Wrap already-encoded JSON frames in a single batch frame"""
+    # Frames are already JSON objects, so the envelope is assembled without
+    # re-encoding them
+    return b'{"type":"batch","messages":[' + b",".join(frames) + b"]}"
+
+def run_event_loop(main):
+    """Run a coroutine to completion, on uvloop when it is installed"""
+    if uvloop is None:
+        return asyncio.run(main)
+    if sys.version_info >= (3, 11):
+        with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+            return runner.run(main)
+    uvloop.install()
+    return asyncio.run(main)
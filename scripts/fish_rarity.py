@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+Fish Rarity
+Shared fish rarity table and catch roll used by the test scripts.
+"""
+
+import bisect
+import itertools
+import random
+
+# Fish rarity configuration
+FISH_TYPES = ['a', 'b', 'c', 'd', 'e', 'f', 'g']
+FISH_PROBABILITIES = [0.4, 0.2, 0.15, 0.12, 0.08, 0.03, 0.02]  # Probabilities that sum to 1.0
+FISH_CUM_WEIGHTS = list(itertools.accumulate(FISH_PROBABILITIES))  # Accumulated once, not per catch
+
+FISH_TOTAL_WEIGHT = FISH_CUM_WEIGHTS[-1]
+
+def catch_fish():
+    """Generate a random fish based on rarity probabilities"""
+    # hi=n-1 (as random.choices does) so float rounding never indexes past the end
+    return FISH_TYPES[bisect.bisect_right(FISH_CUM_WEIGHTS, random.random() * FISH_TOTAL_WEIGHT,
+                                          0, len(FISH_CUM_WEIGHTS) - 1)]
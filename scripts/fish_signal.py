@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+Fish Signal
+Shared localhost signal the test scripts send to the character window on a catch.
+"""
+
+import socket
+import struct
+import time
+
+# A caught fish is signalled by sending the catch time (a little-endian double)
+# in a UDP datagram to this localhost address
+SIGNAL_ADDRESS = ("127.0.0.1", 8766)
+SIGNAL_FORMAT = "<d"
+
+def send_fish_signal():
+    """Signal the character window (simple_character.py); returns False if it could not be sent"""
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.sendto(struct.pack(SIGNAL_FORMAT, time.time()), SIGNAL_ADDRESS)
+    except OSError:
+        return False
+    return True
@@ -8,28 +8,45 @@ import random
 import time
 import asyncio
 from server import GameServer  # Import our base server
+from protocol import run_event_loop
 
 class FishingGameServer(GameServer):
     """Extended game server with fishing mechanics"""
     
+    FISH_TYPES = ("bass", "trout", "salmon", "tuna", "goldfish")
+    
+    # Different fish have different catch difficulties and scores:
+    # type -> (difficulty, score)
+    FISH_STATS = {
+        "goldfish": (0.1, 1),
+        "bass": (0.3, 5),
+        "trout": (0.5, 10),
+        "salmon": (0.7, 20),
+        "tuna": (0.9, 50)
+    }
+    
     def __init__(self, host="localhost", port=8765):
         super().__init__(host, port)
         
         # Game-specific state
         self.fish = []
+        self._next_fish_id = 0
+        self._sent_positions = {}  # fish id -> (x, y) last sent in a fish_update
+        self.game_task = None  # Fish AI loop, started with the server
         self.game_settings = {
             "world_width": 800,
             "world_height": 600,
             "max_fish": 20,
             "fish_spawn_rate": 0.3,  # Fish per second
-            "catch_radius": 30
+            "catch_radius": 30,
+            "update_threshold": 2  # Minimum movement before a position is resent
         }
         
+        # Events produced since the last tick, sent together by _flush_outbound()
+        self._outbound = []
+        
         # Initialize with some fish
         self._spawn_initial_fish()
-        
-        # Start game loop
-        asyncio.create_task(self._game_loop())
     
     def _spawn_initial_fish(self):
         """Spawn initial fish in the world"""
@@ -38,78 +55,84 @@ class FishingGameServer(GameServer):
     
     def _spawn_fish(self):
         """Spawn a single fish at random location"""
-        fish_types = ["bass", "trout", "salmon", "tuna", "goldfish"]
+        # A running counter keeps ids unique even after fish are caught
+        self._next_fish_id += 1
+        fish_type = random.choice(self.FISH_TYPES)
+        difficulty, score = self.FISH_STATS[fish_type]
         fish = {
-            "id": f"fish_{len(self.fish) + 1}_{int(time.time())}",
-            "type": random.choice(fish_types),
+            "id": f"fish_{self._next_fish_id}",
+            "type": fish_type,
             "x": random.randint(50, self.game_settings["world_width"] - 50),
             "y": random.randint(100, self.game_settings["world_height"] - 50),
             "size": random.uniform(0.5, 2.0),
             "speed": random.uniform(10, 50),
             "direction": random.uniform(0, 360),
-            "spawned_at": time.time()
+            "spawned_at": time.time(),
+            "difficulty": difficulty,
+            "score": score
         }
-        
-        # Different fish have different catch difficulties and scores
-        fish_stats = {
-            "goldfish": {"difficulty": 0.1, "score": 1},
-            "bass": {"difficulty": 0.3, "score": 5},
-            "trout": {"difficulty": 0.5, "score": 10},
-            "salmon": {"difficulty": 0.7, "score": 20},
-            "tuna": {"difficulty": 0.9, "score": 50}
-        }
-        
-        fish.update(fish_stats.get(fish["type"], {"difficulty": 0.5, "score": 10}))
         self.fish.append(fish)
         
-        # Notify clients of new fish
-        asyncio.create_task(self.broadcast_message({
+        # Notify clients of new fish on the next tick
+        self._outbound.append({
             "type": "fish_spawned",
             "fish": fish
-        }))
+        })
     
     def _move_fish(self, delta_time):
         """Update fish positions"""
+        # Look the bounds and RNG up once per tick instead of once per fish
+        width = self.game_settings["world_width"]
+        height = self.game_settings["world_height"]
+        rand = random.random
+        
         for fish in self.fish:
-            # Simple movement pattern
-            fish["x"] += fish["speed"] * delta_time * random.uniform(-0.5, 0.5)
-            fish["y"] += fish["speed"] * delta_time * random.uniform(-0.5, 0.5)
+            # Simple movement pattern; random() - 0.5 is the same draw as
+            # uniform(-0.5, 0.5) without the extra Python-level call
+            step = fish["speed"] * delta_time
+            x = fish["x"] + step * (rand() - 0.5)
+            y = fish["y"] + step * (rand() - 0.5)
             
             # Keep fish in bounds
-            fish["x"] = max(0, min(self.game_settings["world_width"], fish["x"]))
-            fish["y"] = max(0, min(self.game_settings["world_height"], fish["y"]))
-    
-    def _calculate_distance(self, pos1, pos2):
-        """Calculate distance between two positions"""
-        return ((pos1["x"] - pos2["x"]) ** 2 + (pos1["y"] - pos2["y"]) ** 2) ** 0.5
+            fish["x"] = 0 if x < 0 else width if x > width else x
+            fish["y"] = 0 if y < 0 else height if y > height else y
     
     async def _attempt_catch_fish(self, client_id, cast_position):
         """Attempt to catch fish near the cast position"""
         caught_fish = []
+        cast_x = cast_position["x"]
+        cast_y = cast_position["y"]
+        # Compare squared distances so no square root is needed per fish
+        radius_sq = self.game_settings["catch_radius"] ** 2
         
-        for fish in self.fish[:]:  # Use slice to avoid modification during iteration
-            distance = self._calculate_distance(cast_position, fish)
+        # Split the fish in one pass instead of removing each catch from the list
+        remaining_fish = []
+        for fish in self.fish:
+            dx = fish["x"] - cast_x
+            dy = fish["y"] - cast_y
             
-            if distance <= self.game_settings["catch_radius"]:
-                # Check if catch is successful based on fish difficulty
-                catch_chance = max(0.1, 1.0 - fish["difficulty"])
-                
-                if random.random() < catch_chance:
-                    # Successfully caught the fish!
-                    caught_fish.append(fish)
-                    self.fish.remove(fish)
-                    
-                    # Update player score
-                    if client_id in self.game_state["players"]:
-                        self.game_state["players"][client_id]["score"] += fish["score"]
-                    
-                    # Notify all clients
-                    await self.broadcast_message({
-                        "type": "fish_caught",
-                        "client_id": client_id,
-                        "fish": fish,
-                        "new_score": self.game_state["players"][client_id]["score"]
-                    })
+            # Check if catch is successful based on fish difficulty
+            if dx * dx + dy * dy > radius_sq or random.random() >= max(0.1, 1.0 - fish["difficulty"]):
+                remaining_fish.append(fish)
+                continue
+            
+            # Successfully caught the fish!
+            caught_fish.append(fish)
+            
+            # Update player score
+            if client_id in self.game_state["players"]:
+                self.game_state["players"][client_id]["score"] += fish["score"]
+            
+            # Notify all clients on the next tick
+            self._outbound.append({
+                "type": "fish_caught",
+                "client_id": client_id,
+                "fish": fish,
+                "new_score": self.game_state["players"][client_id]["score"]
+            })
+        
+        if caught_fish:
+            self.fish[:] = remaining_fish
         
         if not caught_fish:
             # No fish caught
@@ -121,10 +144,9 @@ class FishingGameServer(GameServer):
     
     async def send_message_to_client(self, client_id, message):
         """Send message to a specific client by ID"""
-        for websocket, ws_client_id in self.clients.items():
-            if ws_client_id == client_id:
-                await self.send_message(websocket, message)
-                break
+        websocket = self.client_websockets.get(client_id)
+        if websocket is not None:
+            await self.send_message(websocket, message)
     
     async def handle_player_action(self, websocket, client_id, action_data):
         """Extended player action handler with fishing logic"""
@@ -150,13 +172,70 @@ class FishingGameServer(GameServer):
             # Use parent class for other actions
             await super().handle_player_action(websocket, client_id, action_data)
     
+    def _fish_update_patch(self):
+        """Positions of the fish that moved noticeably since the last fish_update"""
+        threshold = self.game_settings["update_threshold"]
+        last_sent = self._sent_positions
+        sent = {}
+        patch = []
+        
+        for fish in self.fish:
+            fish_id, x, y = fish["id"], fish["x"], fish["y"]
+            last = last_sent.get(fish_id)
+            if last is None or abs(x - last[0]) + abs(y - last[1]) > threshold:
+                patch.append({"id": fish_id, "x": x, "y": y})
+                last = (x, y)
+            sent[fish_id] = last
+        
+        # Rebuilt from the live fish so caught fish drop out
+        self._sent_positions = sent
+        return patch
+    
+    async def register_client(self, websocket, client_data):
+        """Register a client and send it the full fish list to apply patches to"""
+        registered = await super().register_client(websocket, client_data)
+        if registered:
+            await self.send_message(websocket, {
+                "type": "fish_update",
+                "fish": self.fish
+            })
+        return registered
+    
+    async def _flush_outbound(self):
+        """Broadcast the queued events, batching them when there are several"""
+        if not self._outbound:
+            return
+        
+        if len(self._outbound) == 1:
+            message = self._outbound[0]
+        else:
+            message = {"type": "batch", "messages": self._outbound}
+        self._outbound = []
+        await self.broadcast_message(message)
+    
+    async def start_server(self):
+        """Start the WebSocket server along with the game loop"""
+        # Started here rather than in __init__, which runs before the event loop
+        # and kept on self so it isn't garbage collected and can be stopped
+        self.game_task = asyncio.create_task(self._game_loop())
+        try:
+            await super().start_server()
+        finally:
+            self.game_task.cancel()
+    
     async def _game_loop(self):
         """Main game loop for fish AI and spawning"""
-        last_time = time.time()
-        last_spawn = time.time()
+        tick = 0.1  # 10 FPS game loop
+        update_interval = 2.0  # Broadcast fish positions every 2 seconds
+        loop = asyncio.get_running_loop()
+        
+        last_time = loop.time()
+        last_spawn = last_time
+        next_tick = last_time
+        next_update = last_time + update_interval
         
         while True:
-            current_time = time.time()
+            current_time = loop.time()
             delta_time = current_time - last_time
             last_time = current_time
             
@@ -169,15 +248,29 @@ class FishingGameServer(GameServer):
                     self._spawn_fish()
                     last_spawn = current_time
             
-            # Broadcast fish positions every 2 seconds
-            if int(current_time) % 2 == 0:
-                await self.broadcast_message({
-                    "type": "fish_update",
-                    "fish": self.fish
-                })
+            # Broadcast fish positions once per interval
+            if current_time >= next_update:
+                patch = self._fish_update_patch()
+                if patch:
+                    self._outbound.append({
+                        "type": "fish_update",
+                        "patch": patch
+                    })
+                next_update += update_interval
+                if next_update <= current_time:
+                    next_update = current_time + update_interval
+            
+            # Send everything this tick produced as one frame
+            await self._flush_outbound()
             
-            # Sleep to maintain reasonable tick rate
-            await asyncio.sleep(0.1)  # 10 FPS game loop
+            # Sleep until the next tick's deadline so the work above doesn't add
+            # drift; after a long stall, restart the schedule instead of catching up
+            next_tick += tick
+            delay = next_tick - loop.time()
+            if delay < -tick:
+                next_tick = loop.time()
+                delay = 0
+            await asyncio.sleep(max(0, delay))
 
 # Example usage
 if __name__ == "__main__":
@@ -187,7 +280,7 @@ if __name__ == "__main__":
     server = FishingGameServer(host="localhost", port=8765)
     
     try:
-        asyncio.run(server.start_server())
+        run_event_loop(server.start_server())
     except KeyboardInterrupt:
         logging.info("Fishing game server shutting down...")
     except Exception as e:
@@ -10,11 +10,23 @@ from PIL import Image, ImageTk
 import os
 import sys
 
+# Character image locations, in order of preference
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHARACTER_IMAGE_PATHS = [
+    os.path.join(BASE_PATH, "images", "idle_character.png"),           # Main character
+    os.path.join(BASE_PATH, "images", "base_models", "character.png"), # Fallback in base_models
+    os.path.join(BASE_PATH, "images", "character.png")                 # Legacy fallback
+]
+# Resolved once per process rather than for every window
+CHARACTER_IMAGE = next((path for path in CHARACTER_IMAGE_PATHS if os.path.exists(path)), None)
+CHARACTER_IMAGE_MAX_SIZE = (200, 200)  # Larger images are scaled down to fit, never up
+
 class FloatingCharacter:
     """A draggable floating window with character image"""
     
-    def __init__(self):
-        self.root = tk.Tk()
+    def __init__(self, parent=None):
+        # With a parent (the launcher) the character shares its Tk interpreter
+        self.root = tk.Toplevel(parent) if parent is not None else tk.Tk()
         self.root.title("Fishing Game Character")
         
         # Make window always on top
@@ -44,31 +56,15 @@ class FloatingCharacter:
     def setup_image(self):
         """Load and display the character image"""
         try:
-            # Get the path to the image - try multiple possible locations
-            base_path = os.path.dirname(os.path.dirname(__file__))
-            
-            # Try different image paths in order of preference
-            possible_paths = [
-                os.path.join(base_path, "images", "idle_character.png"),           # Main character
-                os.path.join(base_path, "images", "base_models", "character.png"), # Fallback in base_models
-                os.path.join(base_path, "images", "character.png")                 # Legacy fallback
-            ]
-            
-            image_path = None
-            for path in possible_paths:
-                if os.path.exists(path):
-                    image_path = path
-                    break
-            
+            image_path = CHARACTER_IMAGE
             if image_path is None:
-                raise FileNotFoundError(f"Character image not found in any of the expected locations: {possible_paths}")
+                raise FileNotFoundError(f"Character image not found in any of the expected locations: {CHARACTER_IMAGE_PATHS}")
             
             # Load image with PIL
             pil_image = Image.open(image_path)
             
             # Resize image if it's too large (max 200x200)
-            max_size = 200
-            pil_image.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+            pil_image.thumbnail(CHARACTER_IMAGE_MAX_SIZE, Image.Resampling.LANCZOS)
             
             # Convert to PhotoImage
             self.photo = ImageTk.PhotoImage(pil_image)
@@ -118,6 +114,13 @@ class FloatingCharacter:
             widget.bind("<Button-1>", self.start_drag)
             widget.bind("<B1-Motion>", self.on_drag)
             widget.bind("<ButtonRelease-1>", self.stop_drag)
+        
+        # Screen and window sizes are cached for on_drag instead of being queried
+        # from Tk on every motion event; <Configure> tracks window size changes
+        self.screen_width = self.root.winfo_screenwidth()
+        self.screen_height = self.root.winfo_screenheight()
+        self.max_x = self.max_y = 0
+        self.root.bind("<Configure>", self.on_configure)
     
     def start_drag(self, event):
         """Start dragging the window"""
@@ -130,19 +133,20 @@ class FloatingCharacter:
         new_x = self.root.winfo_x() + (event.x - self.drag_data["x"])
         new_y = self.root.winfo_y() + (event.y - self.drag_data["y"])
         
-        # Get screen and window dimensions
-        screen_width = self.root.winfo_screenwidth()
-        screen_height = self.root.winfo_screenheight()
-        window_width = self.root.winfo_width()
-        window_height = self.root.winfo_height()
-        
         # Constrain to screen boundaries
-        new_x = max(0, min(new_x, screen_width - window_width))
-        new_y = max(0, min(new_y, screen_height - window_height))
+        new_x = max(0, min(new_x, self.max_x))
+        new_y = max(0, min(new_y, self.max_y))
         
         # Move window
         self.root.geometry(f"+{new_x}+{new_y}")
     
+    def on_configure(self, event):
+        """Update the drag bounds when the window's size changes"""
+        # Child widgets' <Configure> events reach this binding too
+        if event.widget is self.root:
+            self.max_x = self.screen_width - event.width
+            self.max_y = self.screen_height - event.height
+    
     def stop_drag(self, event):
         """Stop dragging"""
         pass
@@ -208,12 +212,16 @@ class FloatingCharacter:
         self.root.quit()
         self.root.destroy()
     
-    def run(self):
-        """Start the floating window"""
+    def print_instructions(self):
+        """Print how to use the floating window"""
         print("🎣 Starting floating character window...")
         print("💡 Right-click for options menu")
         print("💡 Left-click and drag to move window")
         print("💡 Press Ctrl+C in terminal to close")
+    
+    def run(self):
+        """Start the floating window"""
+        self.print_instructions()
         
         try:
             self.root.mainloop()
@@ -230,6 +238,7 @@ class FloatingCharacterLauncher:
         self.root.title("Floating Character Launcher")
         self.root.geometry("300x200")
         self.root.resizable(False, False)
+        self.character = None
         
         # Center the launcher
         self.center_window()
@@ -296,16 +305,23 @@ class FloatingCharacterLauncher:
         self.root.withdraw()  # Hide launcher
         
         try:
-            character = FloatingCharacter()
-            character.run()
+            # A Toplevel on the launcher's root, driven by the launcher's mainloop;
+            # closing it quits that loop
+            self.character = FloatingCharacter(self.root)
+            self.character.print_instructions()
         except Exception as e:
             print(f"Error launching character window: {e}")
-        finally:
             self.root.quit()
     
     def run(self):
         """Run the launcher"""
-        self.root.mainloop()
+        # This mainloop also drives the launched character window, so Ctrl+C
+        # is handled here just as in FloatingCharacter.run()
+        try:
+            self.root.mainloop()
+        except KeyboardInterrupt:
+            print("\nClosing floating character window...")
+            self.root.quit()
 
 # Main execution
 if __name__ == "__main__":
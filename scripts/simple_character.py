@@ -7,12 +7,20 @@ A lightweight draggable window displaying the character image.
 import tkinter as tk
 from PIL import Image, ImageTk
 import os
-import asyncio
-import websockets
-import json
+import socket
+import struct
+import sys
 import threading
 import time
 
+from fish_signal import SIGNAL_ADDRESS, SIGNAL_FORMAT  # Where the test scripts signal a catch
+
+# Character images (from parent directory)
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+NORMAL_IMAGE_PATH = os.path.join(BASE_PATH, "images", "idle_character.png")
+CAUGHT_IMAGE_PATH = os.path.join(BASE_PATH, "images", "caught_character.png")
+IMAGE_MAX_SIZE = (150, 150)  # Larger images are scaled down to fit, never up
+
 class SimpleFloatingCharacter:
     """A simple draggable floating character window"""
     
@@ -31,6 +39,7 @@ class SimpleFloatingCharacter:
         self.showing_excitement = False
         self.original_image = None
         self.caught_image = None
+        self.signal_socket = None
         
         self.setup_window()
         self.setup_dragging()
@@ -42,21 +51,17 @@ class SimpleFloatingCharacter:
     def setup_window(self):
         """Setup the window with character image"""
         try:
-            # Load both character images (from parent directory)
-            base_path = os.path.dirname(os.path.dirname(__file__))
-            normal_image_path = os.path.join(base_path, "images", "idle_character.png")
-            caught_image_path = os.path.join(base_path, "images", "caught_character.png")
-            
-            if os.path.exists(normal_image_path):
+            # Load both character images
+            if os.path.exists(NORMAL_IMAGE_PATH):
                 # Load and process normal character image
-                self.original_image = self.load_and_process_image(normal_image_path)
+                self.original_image = self.load_and_process_image(NORMAL_IMAGE_PATH)
                 
                 # Load and process caught character image
-                if os.path.exists(caught_image_path):
-                    self.caught_image = self.load_and_process_image(caught_image_path)
+                if os.path.exists(CAUGHT_IMAGE_PATH):
+                    self.caught_image = self.load_and_process_image(CAUGHT_IMAGE_PATH)
                     print(f"✅ Both character images loaded successfully")
                 else:
-                    print(f"⚠️ Caught character image not found at: {caught_image_path}")
+                    print(f"⚠️ Caught character image not found at: {CAUGHT_IMAGE_PATH}")
                     self.caught_image = self.original_image  # Use same image as fallback
                 
                 # Create image label with normal character image
@@ -103,6 +108,13 @@ class SimpleFloatingCharacter:
         
         # Double-click to close (since no X button)
         self.label.bind("<Double-Button-1>", self.double_click_close)
+        
+        # Screen and window sizes are cached for on_drag instead of being queried
+        # from Tk on every motion event; <Configure> tracks window size changes
+        self.screen_width = self.root.winfo_screenwidth()
+        self.screen_height = self.root.winfo_screenheight()
+        self.max_x = self.max_y = 0
+        self.root.bind("<Configure>", self.on_configure)
     
     def start_drag(self, event):
         """Start dragging"""
@@ -115,18 +127,19 @@ class SimpleFloatingCharacter:
         new_x = self.root.winfo_x() + (event.x - self.drag_data["x"])
         new_y = self.root.winfo_y() + (event.y - self.drag_data["y"])
         
-        # Get screen and window dimensions
-        screen_width = self.root.winfo_screenwidth()
-        screen_height = self.root.winfo_screenheight()
-        window_width = self.root.winfo_width()
-        window_height = self.root.winfo_height()
-        
         # Constrain to screen boundaries
-        new_x = max(0, min(new_x, screen_width - window_width))
-        new_y = max(0, min(new_y, screen_height - window_height))
+        new_x = max(0, min(new_x, self.max_x))
+        new_y = max(0, min(new_y, self.max_y))
         
         self.root.geometry(f"+{new_x}+{new_y}")
     
+    def on_configure(self, event):
+        """Update the drag bounds when the window's size changes"""
+        # Child widgets' <Configure> events reach this binding too
+        if event.widget is self.root:
+            self.max_x = self.screen_width - event.width
+            self.max_y = self.screen_height - event.height
+    
     def stop_drag(self, event):
         """Stop dragging"""
         pass
@@ -162,8 +175,23 @@ class SimpleFloatingCharacter:
     
     def setup_periodic_excitement(self):
         """Setup periodic excitement animation and fish signal monitoring"""
-        # Check for fish caught signals every 100ms
-        self.check_for_fish_signal()
+        try:
+            self.signal_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.signal_socket.bind(SIGNAL_ADDRESS)
+        except OSError as e:
+            print(f"⚠️ Fish signals unavailable ({SIGNAL_ADDRESS[0]}:{SIGNAL_ADDRESS[1]}): {e}")
+            if self.signal_socket is not None:  # None if socket() itself failed
+                self.signal_socket.close()
+                self.signal_socket = None
+            return
+        
+        if sys.platform != "win32":
+            # Tk wakes us when a datagram arrives; nothing runs while idle
+            self.signal_socket.setblocking(False)
+            self.root.tk.createfilehandler(self.signal_socket, tk.READABLE, self.on_signal_ready)
+        else:
+            # Tk can't watch sockets on Windows, so block on them in a thread
+            threading.Thread(target=self.receive_signals, daemon=True).start()
         
     def trigger_periodic_excitement(self):
         """Trigger excitement and schedule next one"""  
@@ -174,62 +202,38 @@ class SimpleFloatingCharacter:
         next_excitement = random.randint(10000, 30000)  # 10-30 seconds
         self.root.after(next_excitement, self.trigger_periodic_excitement)
     
-    def listen_for_fish_catches(self):
-        """Listen for fish catch events from the game server"""
-        async def connect_and_listen():
+    def on_signal_ready(self, sock, mask):
+        """Read every fish signal that is waiting on the socket"""
+        while True:
             try:
-                # Try to connect to the game server
-                websocket = await websockets.connect("ws://localhost:8765")
-                
-                # Send a simple join request as observer
-                join_message = {
-                    "type": "join_lobby",
-                    "lobby_code": "OBSERVER",  # This won't work but we'll try anyway
-                    "player_name": "FloatingCharacter"
-                }
-                await websocket.send(json.dumps(join_message))
-                
-                # Listen for messages
-                async for message in websocket:
-                    try:
-                        data = json.loads(message)
-                        if data.get("type") == "fish_caught":
-                            # Show excitement when any player catches a fish
-                            self.root.after(0, self.show_excitement)
-                    except:
-                        pass
-                        
-            except Exception as e:
-                print(f"Character connection to game server failed: {e}")
-        
-        try:
-            asyncio.run(connect_and_listen())
-        except:
-            pass
+                data = self.signal_socket.recv(64)
+            except OSError:
+                return  # Nothing more waiting (BlockingIOError)
+            self.handle_fish_signal(data)
     
-    def check_for_fish_signal(self):
-        """Check for fish caught signal file and trigger excitement"""
+    def receive_signals(self):
+        """Receive fish signals in a background thread (Windows)"""
+        while self.signal_socket is not None:
+            try:
+                data = self.signal_socket.recv(64)
+            except OSError:
+                return  # Socket closed
+            self.root.after(0, self.handle_fish_signal, data)
+    
+    def handle_fish_signal(self, data):
+        """Trigger excitement for a fish caught signal"""
+        if self.showing_excitement:
+            return  # Already showing a catch; the signal only needed draining
+        
         try:
-            # Signal file is in parent directory
-            signal_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), "fish_caught_signal.tmp")
-            if os.path.exists(signal_file):
-                # Read the timestamp
-                with open(signal_file, "r") as f:
-                    timestamp = float(f.read().strip())
-                
-                # Check if this signal is new (within last 5 seconds)
-                if time.time() - timestamp < 5:
-                    self.show_excitement()
-                    
-                # Remove the signal file
-                os.remove(signal_file)
-                
-        except Exception as e:
-            pass  # Ignore any errors in signal checking
+            (timestamp,) = struct.unpack(SIGNAL_FORMAT, data)
+        except struct.error:
+            return  # Ignore anything that isn't a signal
         
-        # Schedule next check in 100ms
-        self.root.after(100, self.check_for_fish_signal)
-
+        # Check if this signal is new (within last 5 seconds)
+        if time.time() - timestamp < 5:
+            self.show_excitement()
+    
     def show_excitement(self):
         """Show excitement by changing to caught character image"""
         if self.showing_excitement or not self.caught_image:
@@ -253,6 +257,11 @@ class SimpleFloatingCharacter:
     
     def close(self):
         """Close the window"""
+        if self.signal_socket is not None:
+            if sys.platform != "win32":
+                self.root.tk.deletefilehandler(self.signal_socket)
+            sock, self.signal_socket = self.signal_socket, None
+            sock.close()
         self.root.quit()
         self.root.destroy()
     
@@ -272,28 +281,15 @@ class SimpleFloatingCharacter:
     
     def load_and_process_image(self, image_path):
         """Load and process an image with transparency support"""
-        # Load and resize image
+        # Load and resize image. thumbnail() must run on the freshly opened image:
+        # it shrinks while decoding (draft/reduce), and a copy() first would force
+        # a full-size decode.
         pil_image = Image.open(image_path)
-        pil_image.thumbnail((150, 150), Image.Resampling.LANCZOS)
-        
-        # Convert to RGBA for transparency support
-        if pil_image.mode != 'RGBA':
-            pil_image = pil_image.convert('RGBA')
-        
-        # Create a transparent background version
-        # This preserves white pixels in the character while making background transparent
-        data = pil_image.getdata()
-        new_data = []
-        for item in data:
-            # Only make pure white pixels (255,255,255) at edges transparent
-            # This is a simple approach - you might want to refine this
-            if item[:3] == (255, 255, 255) and len(item) == 4:
-                # Keep white pixels but with slight opacity to distinguish from pure background
-                new_data.append((255, 255, 255, 200))  # Slightly transparent white
-            else:
-                new_data.append(item)
+        pil_image.thumbnail(IMAGE_MAX_SIZE, Image.Resampling.LANCZOS)
         
-        pil_image.putdata(new_data)
+        # No RGBA pass needed: ImageTk keeps the PNG's own transparency (including
+        # palette transparency), and white pixels already stand out from the
+        # gray90 background that -transparentcolor removes
         return ImageTk.PhotoImage(pil_image)
 
 if __name__ == "__main__":
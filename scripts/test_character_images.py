@@ -6,10 +6,8 @@ Quick test to verify the caught_character.png image switching works.
 
 import os
 import time
-import sys
 
-# Add parent directory to path for imports
-sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from fish_signal import send_fish_signal
 
 def test_image_switching():
     """Test the character image switching functionality"""
@@ -37,18 +35,18 @@ def test_image_switching():
     
     print("\n🎯 Simulating fish catch...")
     
-    # Simulate fish catch by creating signal file every 5 seconds
-    signal_file = os.path.join(base_path, "fish_caught_signal.tmp")
-    
+    # Simulate fish catch by sending a signal datagram every 2.5 seconds.
+    # Signals are delivered at once, but the character ignores new ones while
+    # it is still showing the previous catch (2 seconds), so that sets the gap.
     for i in range(3):
-        print(f"Creating fish caught signal {i+1}/3...")
-        with open(signal_file, "w") as f:
-            f.write(str(time.time()))
+        if i:
+            time.sleep(2.5)  # Wait out the previous excitement
         
-        print("✅ Signal created! Character should switch to caught_character.png")
-        print("   (Signal will be processed by character window if running)")
+        print(f"Sending fish caught signal {i+1}/3...")
+        send_fish_signal()
         
-        time.sleep(3)  # Wait 3 seconds between signals
+        print("✅ Signal sent! Character should switch to caught_character.png")
+        print("   (Signal will be processed by character window if running)")
     
     print("\n🎉 Test completed!")
     print("If character window is running, you should have seen:")
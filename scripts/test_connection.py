@@ -8,52 +8,56 @@ import asyncio
 import websockets
 import json
 import logging
-import time
 import random
+import sys
+import os
+
+# protocol.py lives in the project root, one level above this script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fish_rarity import catch_fish
+from fish_signal import send_fish_signal
+from protocol import dumps as _dumps, loads as _loads, encode_batch, run_event_loop
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Fish rarity configuration
-FISH_TYPES = ['a', 'b', 'c', 'd', 'e', 'f', 'g']
-FISH_PROBABILITIES = [0.4, 0.2, 0.15, 0.12, 0.08, 0.03, 0.02]  # Probabilities that sum to 1.0
-
-def catch_fish():
-    """Generate a random fish based on rarity probabilities"""
-    return random.choices(FISH_TYPES, weights=FISH_PROBABILITIES)[0]
-
 def trigger_excitement():
     """Trigger the excitement mark (!) - placeholder for character window integration"""
     print("🎣 FISH CAUGHT! (!) - Character should show excitement mark!")
     
-    # Try to trigger excitement in character window via simple file signal
-    # This is a simple inter-process communication method
-    try:
-        with open("fish_caught_signal.tmp", "w") as f:
-            f.write(str(time.time()))
-    except:
-        pass  # Ignore if file can't be written
+    # Signal the character window (simple_character.py); ignored if it can't be sent
+    send_fish_signal()
+
+# Constant control messages are encoded once at import; only the fish type
+# in a catch report changes at runtime
+START_FISHING_FRAME = _dumps({"type": "player_action", "data": {"action": "start_fishing"}})
+STOP_FISHING_FRAME = _dumps({"type": "player_action", "data": {"action": "stop_fishing"}})
+FISH_CAUGHT_FRAME_PREFIX = b'{"type":"player_action","data":{"action":"fish_caught","fish_type":'
 
-async def fishing_loop(websocket, fishing_duration=10):
+async def send_frames(websocket, frames):
+    """Send queued frames, coalescing several into one batch frame"""
+    if len(frames) == 1:
+        await websocket.send(frames[0])
+    elif frames:
+        await websocket.send(encode_batch(frames))
+
+async def fishing_loop(websocket, fishing_duration=10, verbose=True):
     """
     Fishing loop that checks every second for fish catch (5% chance)
     
     Args:
         websocket: The websocket connection
         fishing_duration: How long to fish in seconds
+        verbose: Print a progress line for seconds without a catch
     """
     print(f"🎣 Starting fishing for {fishing_duration} seconds...")
     
     # Send start fishing message
-    start_fishing_msg = {
-        "type": "player_action",
-        "data": {
-            "action": "start_fishing"
-        }
-    }
-    await websocket.send(json.dumps(start_fishing_msg))
+    await websocket.send(START_FISHING_FRAME)
     
+    pending = []
     for second in range(fishing_duration):
         await asyncio.sleep(1)  # Wait 1 second
         
@@ -64,25 +68,18 @@ async def fishing_loop(websocket, fishing_duration=10):
             trigger_excitement()
             
             # Optionally send fish catch to server (if server supports it)
-            fish_catch_msg = {
-                "type": "player_action", 
-                "data": {
-                    "action": "fish_caught",
-                    "fish_type": caught_fish
-                }
-            }
-            await websocket.send(json.dumps(fish_catch_msg))
-        else:
+            pending.append(FISH_CAUGHT_FRAME_PREFIX + _dumps(caught_fish) + b"}}")
+        elif verbose:
             print(f"⏰ Fishing... ({second + 1}s) - No fish yet")
+        
+        # A catch on the final tick goes out in the same frame as the stop message
+        if second < fishing_duration - 1:
+            await send_frames(websocket, pending)
+            pending.clear()
     
     # Send stop fishing message
-    stop_fishing_msg = {
-        "type": "player_action",
-        "data": {
-            "action": "stop_fishing"
-        }
-    }
-    await websocket.send(json.dumps(stop_fishing_msg))
+    pending.append(STOP_FISHING_FRAME)
+    await send_frames(websocket, pending)
     print("🎣 Fishing session ended.")
 
 async def test_connection():
@@ -96,7 +93,7 @@ async def test_connection():
     # First, let's check if server is running
     try:
         # Try to connect
-        websocket = await websockets.connect(f"ws://{server_host}:{server_port}")
+        websocket = await websockets.connect(f"ws://{server_host}:{server_port}", compression=None, max_size=2**20)
         print("✅ Successfully connected to server!")
         
         # Get lobby code from user
@@ -111,11 +108,12 @@ async def test_connection():
         }
         
         print(f"Sending join request with lobby code: {lobby_code}")
-        await websocket.send(json.dumps(join_message))
+        await websocket.send(_dumps(join_message))
         
-        # Wait for response
-        response_raw = await websocket.recv()
-        response = json.loads(response_raw)
+        # Wait for response; frames are read as bytes (no UTF-8 decode) and
+        # handed straight to the codec
+        response_raw = await websocket.recv(decode=False)
+        response = _loads(response_raw)
         
         print(f"Server response: {response}")
         
@@ -130,7 +128,7 @@ async def test_connection():
                 "type": "chat_message",
                 "text": "Hello from fishing test script!"
             }
-            await websocket.send(json.dumps(chat_msg))
+            await websocket.send(_dumps(chat_msg))
             
             # Start fishing loop (10 seconds of fishing)
             print("Starting fishing test...")
@@ -140,8 +138,8 @@ async def test_connection():
             print("Listening for server messages...")
             for i in range(5):
                 try:
-                    message = await asyncio.wait_for(websocket.recv(), timeout=2.0)
-                    data = json.loads(message)
+                    message = await asyncio.wait_for(websocket.recv(decode=False), timeout=2.0)
+                    data = _loads(message)
                     print(f"Received: {data.get('type', 'unknown')} - {data}")
                 except asyncio.TimeoutError:
                     print("No message received (timeout)")
@@ -164,7 +162,7 @@ async def test_connection():
     except websockets.exceptions.InvalidURI:
         print("❌ Invalid server URI")
         
-    except json.JSONDecodeError as e:
+    except json.JSONDecodeError as e:  # orjson's decode error subclasses this
         print(f"❌ Invalid JSON response: {e}")
         
     except Exception as e:
@@ -174,4 +172,4 @@ async def test_connection():
 
 if __name__ == "__main__":
     print("Starting connection test...")
-    asyncio.run(test_connection())
+    run_event_loop(test_connection())
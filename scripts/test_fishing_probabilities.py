@@ -5,13 +5,9 @@ Test script to validate the fish rarity distribution.
 """
 
 import random
-import sys
-import os
+from collections import Counter
 
-# Add the parent directory to path to import from test_connection
-sys.path.append(os.path.dirname(__file__))
-
-from test_connection import FISH_TYPES, FISH_PROBABILITIES, catch_fish
+from fish_rarity import FISH_TYPES, FISH_PROBABILITIES, catch_fish
 
 def test_fish_probabilities(num_catches=1000):
     """Test fish catching probabilities over many attempts"""
@@ -19,17 +15,14 @@ def test_fish_probabilities(num_catches=1000):
     print(f"Testing {num_catches} fish catches...")
     print(f"Expected probabilities: {dict(zip(FISH_TYPES, FISH_PROBABILITIES))}")
     
-    # Count catches
-    catch_counts = {fish: 0 for fish in FISH_TYPES}
-    
-    for _ in range(num_catches):
-        caught_fish = catch_fish()
-        catch_counts[caught_fish] += 1
+    # Count catches; Counter tallies the whole stream in C and reports 0 for
+    # fish that never came up
+    catch_counts = Counter(catch_fish() for _ in range(num_catches))
     
     # Calculate actual probabilities
     print(f"\n--- Results ---")
-    for fish in FISH_TYPES:
-        expected = FISH_PROBABILITIES[FISH_TYPES.index(fish)] * 100
+    for fish, probability in zip(FISH_TYPES, FISH_PROBABILITIES):
+        expected = probability * 100
         actual = (catch_counts[fish] / num_catches) * 100
         difference = abs(expected - actual)
         
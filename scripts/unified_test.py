@@ -8,55 +8,54 @@ import asyncio
 import websockets
 import json
 import logging
-import time
 import random
 import sys
 import os
 
-# Add parent directory to path for imports
-sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+# protocol.py lives in the project root, one level above this script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fish_rarity import FISH_TYPES, catch_fish
+from fish_signal import send_fish_signal
+from protocol import dumps as _dumps, loads as _loads, encode_batch, run_event_loop
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Fish rarity configuration
-FISH_TYPES = ['a', 'b', 'c', 'd', 'e', 'f', 'g']
-FISH_PROBABILITIES = [0.4, 0.2, 0.15, 0.12, 0.08, 0.03, 0.02]  # Probabilities that sum to 1.0
-
-def catch_fish():
-    """Generate a random fish based on rarity probabilities"""
-    return random.choices(FISH_TYPES, weights=FISH_PROBABILITIES)[0]
-
 def trigger_excitement():
     """Trigger the excitement mark (!) - signals character window"""
     print("🎣 FISH CAUGHT! (!) - Character should show excitement mark!")
     
-    # Try to trigger excitement in character window via simple file signal
-    try:
-        signal_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "fish_caught_signal.tmp")
-        with open(signal_path, "w") as f:
-            f.write(str(time.time()))
-    except:
-        pass  # Ignore if file can't be written
+    # Signal the character window (simple_character.py); ignored if it can't be sent
+    send_fish_signal()
 
 # Probability distribution testing removed per user request
 
-async def fishing_loop(websocket, fishing_duration=10):
+# Constant control messages are encoded once at import; only the fish type
+# in a catch report changes at runtime
+START_FISHING_FRAME = _dumps({"type": "player_action", "data": {"action": "start_fishing"}})
+STOP_FISHING_FRAME = _dumps({"type": "player_action", "data": {"action": "stop_fishing"}})
+FISH_CAUGHT_FRAME_PREFIX = b'{"type":"player_action","data":{"action":"fish_caught","fish_type":'
+GET_GAME_STATE_FRAME = _dumps({"type": "get_game_state"})
+
+async def send_frames(websocket, frames):
+    """Send queued frames, coalescing several into one batch frame"""
+    if len(frames) == 1:
+        await websocket.send(frames[0])
+    elif frames:
+        await websocket.send(encode_batch(frames))
+
+async def fishing_loop(websocket, fishing_duration=10, verbose=True):
     """
     Fishing loop that checks every second for fish catch (5% chance)
     """
     print(f"\n🎣 Starting fishing for {fishing_duration} seconds...")
     
     # Send start fishing message
-    start_fishing_msg = {
-        "type": "player_action",
-        "data": {
-            "action": "start_fishing"
-        }
-    }
-    await websocket.send(json.dumps(start_fishing_msg))
+    await websocket.send(START_FISHING_FRAME)
     
+    pending = []
     caught_fish_list = []
     for second in range(fishing_duration):
         await asyncio.sleep(1)  # Wait 1 second
@@ -69,25 +68,18 @@ async def fishing_loop(websocket, fishing_duration=10):
             trigger_excitement()
             
             # Send fish catch to server
-            fish_catch_msg = {
-                "type": "player_action", 
-                "data": {
-                    "action": "fish_caught",
-                    "fish_type": caught_fish
-                }
-            }
-            await websocket.send(json.dumps(fish_catch_msg))
-        else:
+            pending.append(FISH_CAUGHT_FRAME_PREFIX + _dumps(caught_fish) + b"}}")
+        elif verbose:
             print(f"⏰ Fishing... ({second + 1}s) - No fish yet")
+        
+        # A catch on the final tick goes out in the same frame as the stop message
+        if second < fishing_duration - 1:
+            await send_frames(websocket, pending)
+            pending.clear()
     
     # Send stop fishing message
-    stop_fishing_msg = {
-        "type": "player_action",
-        "data": {
-            "action": "stop_fishing"
-        }
-    }
-    await websocket.send(json.dumps(stop_fishing_msg))
+    pending.append(STOP_FISHING_FRAME)
+    await send_frames(websocket, pending)
     print(f"🎣 Fishing session ended. Total fish caught: {len(caught_fish_list)}")
     if caught_fish_list:
         print(f"Fish types caught: {caught_fish_list}")
@@ -104,7 +96,7 @@ async def test_connection_and_fishing():
     
     try:
         # Try to connect
-        websocket = await websockets.connect(f"ws://{server_host}:{server_port}")
+        websocket = await websockets.connect(f"ws://{server_host}:{server_port}", compression=None, max_size=2**20)
         print("✅ Successfully connected to server!")
         
         # Get lobby code from user
@@ -119,11 +111,12 @@ async def test_connection_and_fishing():
         }
         
         print(f"Sending join request with lobby code: {lobby_code}")
-        await websocket.send(json.dumps(join_message))
+        await websocket.send(_dumps(join_message))
         
-        # Wait for response
-        response_raw = await websocket.recv()
-        response = json.loads(response_raw)
+        # Wait for response; frames are read as bytes (no UTF-8 decode) and
+        # handed straight to the codec
+        response_raw = await websocket.recv(decode=False)
+        response = _loads(response_raw)
         
         print(f"Server response: {response}")
         
@@ -138,7 +131,7 @@ async def test_connection_and_fishing():
                 "type": "chat_message",
                 "text": "Hello from unified fishing test!"
             }
-            await websocket.send(json.dumps(chat_msg))
+            await websocket.send(_dumps(chat_msg))
             
             # Start fishing test
             print("Starting fishing mechanics test...")
@@ -146,15 +139,14 @@ async def test_connection_and_fishing():
             
             # Request game state
             print("Requesting game state...")
-            state_msg = {"type": "get_game_state"}
-            await websocket.send(json.dumps(state_msg))
+            await websocket.send(GET_GAME_STATE_FRAME)
             
             # Listen for server messages
             print("Listening for server messages...")
             for i in range(3):
                 try:
-                    message = await asyncio.wait_for(websocket.recv(), timeout=2.0)
-                    data = json.loads(message)
+                    message = await asyncio.wait_for(websocket.recv(decode=False), timeout=2.0)
+                    data = _loads(message)
                     print(f"Received: {data.get('type', 'unknown')} - {data}")
                 except asyncio.TimeoutError:
                     print("No message received (timeout)")
@@ -182,7 +174,7 @@ async def test_connection_and_fishing():
         print("❌ Invalid server URI")
         return False
         
-    except json.JSONDecodeError as e:
+    except json.JSONDecodeError as e:  # orjson's decode error subclasses this
         print(f"❌ Invalid JSON response: {e}")
         return False
         
@@ -218,22 +210,13 @@ def test_character_images():
         print("❌ Caught character image (caught_character.png) NOT found")
         results['caught_image'] = False
     
-    # Test signal file creation
+    # Test signal sending
     print("\nTesting image switching signal system...")
-    try:
-        signal_file = os.path.join(base_path, "fish_caught_signal.tmp")
-        with open(signal_file, "w") as f:
-            f.write(str(time.time()))
-        
-        if os.path.exists(signal_file):
-            print("✅ Signal file creation successful")
-            os.remove(signal_file)  # Clean up
-            results['signal_system'] = True
-        else:
-            print("❌ Signal file creation failed")
-            results['signal_system'] = False
-    except Exception as e:
-        print(f"❌ Signal system error: {e}")
+    if send_fish_signal():
+        print("✅ Signal sent successfully")
+        results['signal_system'] = True
+    else:
+        print("❌ Signal system error: could not send the fish signal")
         results['signal_system'] = False
     
     success = all(results.values())
@@ -298,7 +281,7 @@ def main():
     user_input = input("Test server connection? (y/N): ").strip().lower()
     if user_input in ['y', 'yes']:
         try:
-            test_results['connection'] = asyncio.run(test_connection_and_fishing())
+            test_results['connection'] = run_event_loop(test_connection_and_fishing())
         except KeyboardInterrupt:
             print("\n⏹️ Connection test cancelled by user")
             test_results['connection'] = False
@@ -6,58 +6,76 @@ A secure WebSocket server for a 2D fishing game with lobby system and spam prote
 
 import asyncio
 import websockets
-import json
 import random
+import secrets
 import string
 import time
-from typing import Dict, Set, Optional, Any
+from typing import Dict, Set, Optional, Any, Tuple
 import logging
 
+from protocol import dumps as _dumps, loads as _loads, encode_batch, run_event_loop, setup_logging
+
 # Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+setup_logging()
 logger = logging.getLogger(__name__)
 
 class RateLimiter:
-    """Simple rate limiter to prevent spam"""
+    """Token-bucket rate limiter to prevent spam"""
     def __init__(self, max_messages: int = 10, window_seconds: int = 1):
         self.max_messages = max_messages
         self.window_seconds = window_seconds
-        self.message_times: Dict[str, list] = {}
+        self.refill_rate = max_messages / window_seconds  # Tokens regained per second
+        self.buckets: Dict[str, Tuple[float, float]] = {}  # client_id -> (tokens, last refill)
     
     def is_allowed(self, client_id: str) -> bool:
         """Check if client is allowed to send a message (not rate limited)"""
-        current_time = time.time()
+        now = time.monotonic()
         
-        if client_id not in self.message_times:
-            self.message_times[client_id] = []
+        bucket = self.buckets.get(client_id)
+        if bucket is None:
+            tokens = self.max_messages  # New clients start with a full bucket
+        else:
+            # Refill for the time since the last allowed message, up to capacity
+            tokens, last_refill = bucket
+            tokens = min(self.max_messages, tokens + (now - last_refill) * self.refill_rate)
         
-        # Clean old messages outside the window
-        self.message_times[client_id] = [
-            msg_time for msg_time in self.message_times[client_id]
-            if current_time - msg_time < self.window_seconds
-        ]
-        
-        # Check if under limit
-        if len(self.message_times[client_id]) >= self.max_messages:
+        # A denied message leaves the bucket untouched; the refill is
+        # recomputed from the same point on the next call
+        if tokens < 1:
             return False
         
-        # Add current message time
-        self.message_times[client_id].append(current_time)
+        self.buckets[client_id] = (tokens - 1, now)
         return True
     
     def remove_client(self, client_id: str):
         """Remove client from rate limiter"""
-        if client_id in self.message_times:
-            del self.message_times[client_id]
+        self.buckets.pop(client_id, None)
 
 class GameServer:
     """Main game server handling lobby and client connections"""
     
+    # Constant replies are encoded once instead of on every send
+    _PONG_FRAME = _dumps({"type": "pong"})
+    _RATE_LIMITED_FRAME = _dumps({"type": "error", "message": "Rate limit exceeded. Slow down!"})
+    _SERVER_ERROR_FRAME = _dumps({"type": "error", "message": "Server error processing your request"})
+    _INVALID_LOBBY_CODE_FRAME = _dumps({"type": "error", "message": "Invalid lobby code"})
+    _LOBBY_FULL_FRAME = _dumps({"type": "error", "message": "Lobby is full"})
+    _JOIN_FIRST_FRAME = _dumps({"type": "error", "message": "First message must be join_lobby"})
+    _INVALID_JSON_FRAME = _dumps({"type": "error", "message": "Invalid JSON format"})
+    
+    _LOBBY_CODE_ALPHABET = string.ascii_uppercase + string.digits
+    _MAX_INVALID_FRAMES = 5  # Per connection, before it is closed
+    
     def __init__(self, host: str = "localhost", port: int = 8765):
         self.host = host
         self.port = port
         self.lobby_code = self._generate_lobby_code()
         self.clients: Dict[Any, str] = {}  # websocket -> client_id
+        self.client_websockets: Dict[str, Any] = {}  # client_id -> websocket
+        self.outboxes: Dict[Any, asyncio.Queue] = {}  # websocket -> queued frames
+        self.senders: Dict[Any, asyncio.Task] = {}  # websocket -> sender task
+        self.closing_tasks: Set[asyncio.Task] = set()  # Background closes of dropped clients
+        self._next_client_id = 0
         self.rate_limiter = RateLimiter(max_messages=15, window_seconds=1)  # 15 messages per second max
         self.game_state = {
             "players": {},
@@ -71,7 +89,8 @@ class GameServer:
     
     def _generate_lobby_code(self) -> str:
         """Generate a random 6-character lobby code"""
-        return ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
+        # secrets rather than random: the code is all that keeps strangers out
+        return ''.join(secrets.choice(self._LOBBY_CODE_ALPHABET) for _ in range(6))
     
     async def register_client(self, websocket: Any, client_data: dict) -> bool:
         """Register a new client after lobby code verification"""
@@ -81,23 +100,20 @@ class GameServer:
             
             # Validate lobby code
             if provided_code != self.lobby_code:
-                await self.send_message(websocket, {
-                    "type": "error",
-                    "message": "Invalid lobby code"
-                })
+                await self._send_frame(websocket, self._INVALID_LOBBY_CODE_FRAME)
                 return False
             
             # Check if server is full (max 2 players for now)
             if len(self.clients) >= 2:
-                await self.send_message(websocket, {
-                    "type": "error",
-                    "message": "Lobby is full"
-                })
+                await self._send_frame(websocket, self._LOBBY_FULL_FRAME)
                 return False
             
-            # Generate unique client ID
-            client_id = f"client_{len(self.clients) + 1}_{int(time.time())}"
+            # Generate unique client ID from a counter; len(self.clients) repeats
+            # once someone leaves, so two joins in the same second could collide
+            self._next_client_id += 1
+            client_id = f"client_{self._next_client_id}"
             self.clients[websocket] = client_id
+            self.client_websockets[client_id] = websocket
             
             # Add player to game state
             self.game_state["players"][client_id] = {
@@ -108,13 +124,15 @@ class GameServer:
                 "connected_at": time.time()
             }
             
-            # Send welcome message
+            # Send welcome message. It goes out directly, before the outbox
+            # exists, so it is always the first frame and never part of a batch.
             await self.send_message(websocket, {
                 "type": "welcome",
                 "client_id": client_id,
                 "player_name": player_name,
                 "lobby_code": self.lobby_code
             })
+            self._open_outbox(websocket)
             
             # Notify other players
             await self.broadcast_message({
@@ -139,6 +157,8 @@ class GameServer:
             
             # Remove from tracking
             del self.clients[websocket]
+            self.client_websockets.pop(client_id, None)
+            self._close_outbox(websocket)
             if client_id in self.game_state["players"]:
                 del self.game_state["players"][client_id]
             
@@ -154,10 +174,59 @@ class GameServer:
             
             logger.info(f"Client {client_id} ({player_name}) left the lobby")
     
+    def _open_outbox(self, websocket: Any):
+        """Give a registered client its queue of outgoing frames and a sender task"""
+        outbox = asyncio.Queue(maxsize=256)
+        self.outboxes[websocket] = outbox
+        self.senders[websocket] = asyncio.create_task(self._send_outbox(websocket, outbox))
+    
+    def _close_outbox(self, websocket: Any):
+        """Stop a client's sender task and drop its queued frames"""
+        self.outboxes.pop(websocket, None)
+        sender = self.senders.pop(websocket, None)
+        if sender is not None:
+            sender.cancel()
+    
+    async def _send_outbox(self, websocket: Any, outbox: asyncio.Queue):
+        """Send a client's queued frames, merging everything that is ready into one frame"""
+        try:
+            while True:
+                frames = [await outbox.get()]
+                while not outbox.empty():
+                    frames.append(outbox.get_nowait())
+                
+                if len(frames) == 1:
+                    await websocket.send(frames[0])
+                else:
+                    await websocket.send(encode_batch(frames))
+        except websockets.exceptions.ConnectionClosed:
+            # handle_client sees the close too and unregisters the client
+            pass
+        except Exception as e:
+            logger.error(f"Error sending to client: {e}")
+    
+    def _enqueue(self, websocket: Any, payload: bytes) -> bool:
+        """Queue an encoded frame for a registered client; False if its outbox is full"""
+        try:
+            self.outboxes[websocket].put_nowait(payload)
+            return True
+        except asyncio.QueueFull:
+            logger.warning(f"Client {self.clients.get(websocket)} is not keeping up with messages")
+            return False
+    
     async def send_message(self, websocket: Any, message: dict):
         """Send a JSON message to a specific client"""
+        await self._send_frame(websocket, _dumps(message))
+    
+    async def _send_frame(self, websocket: Any, payload: bytes):
+        """Send an already-encoded frame to a specific client"""
         try:
-            await websocket.send(json.dumps(message))
+            if websocket in self.outboxes:
+                # Registered clients get their messages in order through the outbox
+                if not self._enqueue(websocket, payload):
+                    await self._drop_client(websocket)
+            else:
+                await websocket.send(payload)
         except websockets.exceptions.ConnectionClosed:
             logger.warning("Attempted to send message to closed connection")
         except Exception as e:
@@ -168,20 +237,25 @@ class GameServer:
         if not self.clients:
             return
         
-        disconnected = []
-        for websocket in self.clients:
-            if websocket != exclude:
-                try:
-                    await websocket.send(json.dumps(message))
-                except websockets.exceptions.ConnectionClosed:
-                    disconnected.append(websocket)
-                except Exception as e:
-                    logger.error(f"Error broadcasting to client: {e}")
-                    disconnected.append(websocket)
+        # Encoded once; every outbox shares the same bytes object
+        payload = _dumps(message)
+        slow = [
+            websocket for websocket in self.outboxes
+            if websocket != exclude and not self._enqueue(websocket, payload)
+        ]
         
-        # Clean up disconnected clients
-        for websocket in disconnected:
-            await self.unregister_client(websocket)
+        # Disconnect clients that can't keep up
+        for websocket in slow:
+            await self._drop_client(websocket)
+    
+    async def _drop_client(self, websocket: Any):
+        """Unregister a client whose outbox overflowed and close it in the background"""
+        await self.unregister_client(websocket)
+        # close() waits for the closing handshake, up to close_timeout, from a
+        # peer already known not to be reading; the broadcaster mustn't wait too
+        closing = asyncio.create_task(websocket.close(code=1008, reason="Too many unsent messages"))
+        self.closing_tasks.add(closing)
+        closing.add_done_callback(self.closing_tasks.discard)
     
     async def handle_message(self, websocket: Any, message: dict):
         """Handle incoming messages from clients"""
@@ -189,20 +263,17 @@ class GameServer:
         if not client_id:
             return
         
-        # Rate limiting check
-        if not self.rate_limiter.is_allowed(client_id):
-            await self.send_message(websocket, {
-                "type": "error",
-                "message": "Rate limit exceeded. Slow down!"
-            })
+        message_type = message.get("type", "unknown")
+        
+        # Rate limiting check. A batch envelope is free; only its items are charged.
+        if message_type != "batch" and not self.rate_limiter.is_allowed(client_id):
+            await self._send_frame(websocket, self._RATE_LIMITED_FRAME)
             logger.warning(f"Rate limit exceeded for client {client_id}")
             return
         
-        message_type = message.get("type", "unknown")
-        
         try:
             if message_type == "ping":
-                await self.send_message(websocket, {"type": "pong"})
+                await self._send_frame(websocket, self._PONG_FRAME)
             
             elif message_type == "get_game_state":
                 await self.send_message(websocket, {
@@ -216,8 +287,12 @@ class GameServer:
                 await self.handle_player_action(websocket, client_id, action_data)
             
             elif message_type == "chat_message":
-                # Handle chat messages
-                chat_text = message.get("text", "").strip()
+                # Handle chat messages. Oversized text is rejected before
+                # strip() copies it; surrounding whitespace gets some slack.
+                raw_text = message.get("text", "")
+                if not isinstance(raw_text, str) or len(raw_text) > 400:
+                    return
+                chat_text = raw_text.strip()
                 if chat_text and len(chat_text) <= 200:  # Basic validation
                     player_name = self.game_state["players"][client_id]["name"]
                     await self.broadcast_message({
@@ -228,15 +303,29 @@ class GameServer:
                         "timestamp": time.time()
                     })
             
+            elif message_type == "batch":
+                # Several client messages coalesced into one frame; each one
+                # still goes through the rate limiter on its own
+                items = message.get("messages")
+                if not isinstance(items, list):
+                    return
+                # No more than a full bucket could ever let through; the rest
+                # are refused with a single reply instead of one per item
+                limit = self.rate_limiter.max_messages
+                if len(items) > limit:
+                    logger.warning(f"Batch of {len(items)} messages from client {client_id} truncated to {limit}")
+                    await self._send_frame(websocket, self._RATE_LIMITED_FRAME)
+                    items = items[:limit]
+                for item in items:
+                    if isinstance(item, dict) and item.get("type") != "batch":
+                        await self.handle_message(websocket, item)
+            
             else:
                 logger.warning(f"Unknown message type '{message_type}' from client {client_id}")
                 
         except Exception as e:
             logger.error(f"Error handling message from client {client_id}: {e}")
-            await self.send_message(websocket, {
-                "type": "error",
-                "message": "Server error processing your request"
-            })
+            await self._send_frame(websocket, self._SERVER_ERROR_FRAME)
     
     async def handle_player_action(self, websocket: Any, client_id: str, action_data: dict):
         """Handle player game actions - now focused on fishing!"""
@@ -273,7 +362,6 @@ class GameServer:
     
     def get_random_fish(self):
         """Get a random fish based on probability distribution"""
-        import random
         rand = random.random()
         cumulative = 0
         
@@ -286,7 +374,6 @@ class GameServer:
     
     async def process_fishing(self):
         """Process fishing attempts for all fishing players"""
-        import random
         current_time = time.time()
         
         for client_id in list(self.fishing_players.keys()):
@@ -326,11 +413,14 @@ class GameServer:
     async def handle_client(self, websocket: Any, path: str = ""):
         """Handle a client connection"""
         client_registered = False
+        invalid_frames = 0
         
         try:
-            async for message in websocket:
+            while True:
+                # Frames arrive as bytes (no UTF-8 decode); the codec reads them directly
+                message = await websocket.recv(decode=False)
                 try:
-                    data = json.loads(message)
+                    data = _loads(message)
                     
                     # First message should be registration
                     if not client_registered:
@@ -340,21 +430,24 @@ class GameServer:
                                 await websocket.close(code=1008, reason="Registration failed")
                                 return
                         else:
-                            await self.send_message(websocket, {
-                                "type": "error",
-                                "message": "First message must be join_lobby"
-                            })
+                            await self._send_frame(websocket, self._JOIN_FIRST_FRAME)
                             await websocket.close(code=1008, reason="Invalid handshake")
                             return
                     else:
                         await self.handle_message(websocket, data)
                         
-                except json.JSONDecodeError:
+                except ValueError:
+                    # JSONDecodeError (orjson's subclasses it) or, since frames arrive
+                    # as raw bytes, the stdlib fallback's UnicodeDecodeError.
+                    # Invalid frames never reach the rate limiter, so a client
+                    # that keeps sending them is cut off instead of answered.
+                    invalid_frames += 1
+                    if invalid_frames >= self._MAX_INVALID_FRAMES:
+                        logger.warning(f"Closing client {self.clients.get(websocket)}: too many invalid JSON frames")
+                        await websocket.close(code=1008, reason="Too many invalid messages")
+                        return
                     logger.warning("Received invalid JSON from client")
-                    await self.send_message(websocket, {
-                        "type": "error",
-                        "message": "Invalid JSON format"
-                    })
+                    await self._send_frame(websocket, self._INVALID_JSON_FRAME)
                 except Exception as e:
                     logger.error(f"Error processing message: {e}")
                     
@@ -384,7 +477,16 @@ class GameServer:
         # Start fishing background task
         fishing_task = asyncio.create_task(self.fishing_loop())
         
-        async with websockets.serve(self.handle_client, self.host, self.port):
+        # No permessage-deflate: broadcasts would be recompressed once per client.
+        # A larger write buffer absorbs bursts before send() applies backpressure.
+        # Client frames are small actions and chat lines, so anything over
+        # 64 KiB is refused before it is buffered.
+        async with websockets.serve(
+            self.handle_client, self.host, self.port,
+            compression=None,
+            max_size=2**16,
+            write_limit=2**20,
+        ):
             logger.info("Server is running! Waiting for players...")
             logger.info("🎣 Fishing system active - 5% catch chance every second!")
             await asyncio.Future()  # Run forever
@@ -394,7 +496,7 @@ if __name__ == "__main__":
     server = GameServer(host="localhost", port=8765)
     
     try:
-        asyncio.run(server.start_server())
+        run_event_loop(server.start_server())
     except KeyboardInterrupt:
         logger.info("Server shutting down...")
     except Exception as e: